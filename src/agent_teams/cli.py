@@ -3,96 +3,132 @@
 import argparse
 import json
 import sys
-from . import core
 
 
-def main():
-    parser = argparse.ArgumentParser(prog="agent-teams", description="Agent team coordination")
-    parser.add_argument("--json", action="store_true", help="JSON output")
-    sub = parser.add_subparsers(dest="command")
+# Each subcommand's arguments are added by its own builder so main() only
+# constructs the subparser that is actually being run.
 
-    # team create
-    p = sub.add_parser("create", help="Create a team")
-    p.add_argument("team", help="Team name")
-    p.add_argument("--members", nargs="*", default=[], help="Initial members")
-
-    # team delete
-    p = sub.add_parser("delete", help="Delete a team")
+def _add_team(p):
     p.add_argument("team")
 
-    # team list
-    sub.add_parser("list", help="List teams")
 
-    # team info
-    p = sub.add_parser("info", help="Team info")
-    p.add_argument("team")
+def _add_team_create(p):
+    p.add_argument("team", help="Team name")
+    p.add_argument("--members", nargs="*", default=[], help="Initial members")
 
-    # add-member
-    p = sub.add_parser("add-member", help="Add member to team")
-    p.add_argument("team")
-    p.add_argument("name")
 
-    # remove-member
-    p = sub.add_parser("remove-member", help="Remove member from team")
+def _add_team_member(p):
     p.add_argument("team")
     p.add_argument("name")
 
-    # send
-    p = sub.add_parser("send", help="Send a message")
+
+def _add_send(p):
     p.add_argument("sender", help="sender@team")
     p.add_argument("recipient", help="recipient@team")
     p.add_argument("--text", "-t", required=True)
     p.add_argument("--type", default="message", dest="msg_type")
 
-    # broadcast
-    p = sub.add_parser("broadcast", help="Broadcast to team")
+
+def _add_broadcast(p):
     p.add_argument("sender", help="sender@team")
     p.add_argument("--text", "-t", required=True)
 
-    # poll
-    p = sub.add_parser("poll", help="Poll inbox for new messages")
+
+def _add_poll(p):
     p.add_argument("identity", help="agent@team")
     p.add_argument("--format", choices=["xml", "json"], default="xml")
 
-    # inbox
-    p = sub.add_parser("inbox", help="Read full inbox")
+
+def _add_inbox(p):
     p.add_argument("identity", help="agent@team")
 
-    # task create
-    p = sub.add_parser("task-create", help="Create a task")
+
+def _add_task_create(p):
     p.add_argument("team")
     p.add_argument("--subject", "-s", required=True)
     p.add_argument("--description", "-d", default="")
     p.add_argument("--assign-to", default="")
     p.add_argument("--assign-by", default="")
 
-    # task claim
-    p = sub.add_parser("task-claim", help="Claim a task")
+
+def _add_task_claim(p):
     p.add_argument("team")
     p.add_argument("task_id")
     p.add_argument("agent")
 
-    # task complete
-    p = sub.add_parser("task-complete", help="Complete a task")
+
+def _add_task_complete(p):
     p.add_argument("team")
     p.add_argument("task_id")
     p.add_argument("agent")
     p.add_argument("--result", "-r", default="")
 
-    # task list
-    p = sub.add_parser("task-list", help="List tasks")
+
+def _add_task_list(p):
     p.add_argument("team")
     p.add_argument("--status", choices=["pending", "in_progress", "completed"])
 
-    args = parser.parse_args()
+
+_COMMANDS = {
+    "create": ("Create a team", _add_team_create),
+    "delete": ("Delete a team", _add_team),
+    "list": ("List teams", None),
+    "info": ("Team info", _add_team),
+    "add-member": ("Add member to team", _add_team_member),
+    "remove-member": ("Remove member from team", _add_team_member),
+    "send": ("Send a message", _add_send),
+    "broadcast": ("Broadcast to team", _add_broadcast),
+    "poll": ("Poll inbox for new messages", _add_poll),
+    "inbox": ("Read full inbox", _add_inbox),
+    "task-create": ("Create a task", _add_task_create),
+    "task-claim": ("Claim a task", _add_task_claim),
+    "task-complete": ("Complete a task", _add_task_complete),
+    "task-list": ("List tasks", _add_task_list),
+}
+
+
+def _build_parser(commands) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="agent-teams", description="Agent team coordination")
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    sub = parser.add_subparsers(dest="command")
+    for name in commands:
+        help_text, add_args = _COMMANDS[name]
+        p = sub.add_parser(name, help=help_text)
+        if add_args:
+            add_args(p)
+    return parser
+
+
+def main():
+    argv = sys.argv[1:]
+    # --json is the only global option and takes no value, so the first
+    # positional is the subcommand; unknown or missing ones get the full parser.
+    command = next((a for a in argv if not a.startswith("-")), None)
+    parser = _build_parser([command] if command in _COMMANDS else _COMMANDS)
+    args = parser.parse_args(argv)
     use_json = args.json
 
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    from . import core
+
     def output(data):
         if use_json:
             print(json.dumps(data, indent=2))
         else:
             print(json.dumps(data, indent=2))
 
+    def output_iter(items):
+        # Same text as output(list(items)) without holding every item at once
+        first = True
+        for item in items:
+            sys.stdout.write("[\n" if first else ",\n")
+            sys.stdout.write("  " + json.dumps(item, indent=2).replace("\n", "\n  "))
+            first = False
+        print("[]" if first else "\n]")
+
     try:
         if args.command == "create":
             output(core.create_team(args.team, args.members))
@@ -116,7 +152,7 @@ def main():
             if result:
                 print(result)
         elif args.command == "inbox":
-            output(core.read_inbox(args.identity))
+            output_iter(core.iter_inbox(args.identity))
         elif args.command == "task-create":
             output(core.create_task(args.team, args.subject, args.description, args.assign_to, args.assign_by))
         elif args.command == "task-claim":
@@ -125,9 +161,6 @@ def main():
             output(core.complete_task(args.team, args.task_id, args.agent, args.result))
         elif args.command == "task-list":
             output(core.list_tasks(args.team, args.status))
-        else:
-            parser.print_help()
-            sys.exit(1)
     except Exception as e:
         print(json.dumps({"error": str(e)}), file=sys.stderr)
         sys.exit(1)
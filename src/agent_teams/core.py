@@ -1,19 +1,49 @@
 """Core library for agent-teams: team management, mailbox IPC, task coordination."""
 
+import atexit
 import json
 import os
 import fcntl
+import functools
+import threading
 import time
-import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterator, Optional
+from xml.sax.saxutils import quoteattr
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
 
 TEAMS_ROOT = Path.home() / ".openclaw" / "teams"
 
 def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
+def _dumps(obj, indent: bool = False) -> bytes:
+    """Encode obj as UTF-8 JSON, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+def _tmp_path(path: Path) -> Path:
+    # Unique per writing thread, not just per process, so concurrent writers never share a temp file
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """Replace path with data so readers only ever see a complete file."""
+    tmp = _tmp_path(path)
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+@functools.lru_cache(maxsize=2048)
 def _parse_identity(identity: str) -> tuple[str, str]:
     """Parse 'name@team' into (name, team)."""
     if "@" not in identity:
@@ -21,23 +51,55 @@ def _parse_identity(identity: str) -> tuple[str, str]:
     name, team = identity.split("@", 1)
     return name, team
 
+@functools.lru_cache(maxsize=2048)
 def _team_dir(team: str) -> Path:
     return TEAMS_ROOT / team
 
+@functools.lru_cache(maxsize=2048)
 def _inbox_path(team: str, agent: str) -> Path:
-    return _team_dir(team) / "inboxes" / f"{agent}.json"
+    return _team_dir(team) / "inboxes" / f"{agent}.jsonl"
 
+@functools.lru_cache(maxsize=2048)
 def _tasks_dir(team: str) -> Path:
     return _team_dir(team) / "tasks"
 
+@functools.lru_cache(maxsize=2048)
 def _config_path(team: str) -> Path:
     return _team_dir(team) / "config.json"
 
+@functools.lru_cache(maxsize=2048)
+def _members_path(team: str) -> Path:
+    return _team_dir(team) / "members.txt"
+
+@functools.lru_cache(maxsize=2048)
 def _cursor_path(team: str, agent: str) -> Path:
-    return _team_dir(team) / "inboxes" / f".{agent}.cursor"
+    return _team_dir(team) / "inboxes" / _cursor_name(agent)
+
+def _cursor_name(agent: str) -> str:
+    # Byte offset into the JSONL inbox; named apart from the old message-index .cursor files
+    return f".{agent}.offset"
+
+def _legacy_inbox_paths(inbox: Path) -> tuple[Path, Path]:
+    """The pre-JSONL array inbox and message-index cursor for a JSONL inbox path."""
+    return inbox.with_suffix(".json"), inbox.parent / f".{inbox.stem}.cursor"
+
+def _clear_path_caches():
+    """Forget cached paths; call after changing TEAMS_ROOT."""
+    for fn in (_team_dir, _inbox_path, _tasks_dir, _config_path, _members_path, _cursor_path):
+        fn.cache_clear()
 
 # ── Team Management ──
 
+def _read_members(team: str, config: dict) -> list[str]:
+    try:
+        return _members_path(team).read_text().splitlines()
+    except FileNotFoundError:
+        # Teams created before members.txt kept the list in config.json
+        return list(config.get("members", []))
+
+def _write_members(team: str, members: list[str]):
+    _atomic_write_bytes(_members_path(team), "".join(f"{m}\n" for m in members).encode())
+
 def create_team(team: str, members: Optional[list[str]] = None) -> dict:
     d = _team_dir(team)
     d.mkdir(parents=True, exist_ok=True)
@@ -46,115 +108,220 @@ def create_team(team: str, members: Optional[list[str]] = None) -> dict:
     cp = _config_path(team)
     if cp.exists():
         # Don't overwrite existing team config
-        config = json.loads(cp.read_text())
+        config = _loads(cp.read_bytes())
         # Merge in any new members
+        current = _read_members(team, config)
         for m in (members or []):
-            if m not in config["members"]:
-                config["members"].append(m)
-        cp.write_text(json.dumps(config, indent=2))
+            if m not in current:
+                current.append(m)
+        _write_members(team, current)
     else:
-        config = {"name": team, "members": members or [], "created": _now()}
-        cp.write_text(json.dumps(config, indent=2))
+        config = {"name": team, "created": _now()}
+        _atomic_write_bytes(cp, _dumps(config, indent=True))
+        current = list(members or [])
+        _write_members(team, current)
+    config["members"] = current
+    _config_cache.pop(team, None)
     # Create inboxes for initial members
     for m in (members or []):
-        _inbox_path(team, m).write_text("[]")
+        _ensure_inbox(_inbox_path(team, m))
     return config
 
 def delete_team(team: str) -> bool:
     import shutil
     d = _team_dir(team)
+    _config_cache.pop(team, None)
     if d.exists():
         shutil.rmtree(d)
         return True
     return False
 
 def add_member(team: str, name: str) -> dict:
-    cp = _config_path(team)
-    config = json.loads(cp.read_text())
-    if name not in config["members"]:
-        config["members"].append(name)
-        cp.write_text(json.dumps(config, indent=2))
-    _inbox_path(team, name).write_text("[]")
+    config = team_info(team)
+    members = config["members"]
+    if name not in members:
+        members.append(name)
+        mp = _members_path(team)
+        if mp.exists():
+            with open(mp, "a") as f:
+                f.write(f"{name}\n")
+        else:
+            _write_members(team, members)
+        _config_cache.pop(team, None)
+    _ensure_inbox(_inbox_path(team, name))
     return config
 
 def remove_member(team: str, name: str) -> dict:
-    cp = _config_path(team)
-    config = json.loads(cp.read_text())
+    config = team_info(team)
     config["members"] = [m for m in config["members"] if m != name]
-    cp.write_text(json.dumps(config, indent=2))
+    _write_members(team, config["members"])
+    _config_cache.pop(team, None)
     inbox = _inbox_path(team, name)
-    if inbox.exists():
-        inbox.unlink()
-    cursor = _cursor_path(team, name)
-    if cursor.exists():
-        cursor.unlink()
+    # Also drop pre-JSONL files so a re-added member doesn't inherit them
+    for path in (inbox, _cursor_path(team, name), *_legacy_inbox_paths(inbox)):
+        if path.exists():
+            path.unlink()
     return config
 
 def list_teams() -> list[dict]:
     if not TEAMS_ROOT.exists():
         return []
+    with os.scandir(TEAMS_ROOT) as it:
+        dirs = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
     teams = []
-    for d in sorted(TEAMS_ROOT.iterdir()):
-        cp = d / "config.json"
-        if cp.exists():
-            teams.append(json.loads(cp.read_text()))
+    for e in dirs:
+        try:
+            teams.append(team_info(e.name))
+        except FileNotFoundError:
+            continue
     return teams
 
+# Parsed team info, keyed by team and validated against the files' stat
+_config_cache: dict[str, tuple[tuple, dict]] = {}
+
+def _config_stamp(team: str) -> tuple:
+    st = os.stat(_config_path(team))
+    try:
+        mst = os.stat(_members_path(team))
+    except FileNotFoundError:
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    # st_ino catches same-size os.replace rewrites within one coarse mtime tick
+    return (st.st_ino, st.st_mtime_ns, st.st_size, mst.st_ino, mst.st_mtime_ns, mst.st_size)
+
 def team_info(team: str) -> dict:
-    return json.loads(_config_path(team).read_text())
+    # Stat before reading: a write racing the read just forces a re-read next time
+    stamp = _config_stamp(team)
+    cached = _config_cache.get(team)
+    if cached is None or cached[0] != stamp:
+        config = _loads(_config_path(team).read_bytes())
+        config["members"] = _read_members(team, config)
+        cached = _config_cache[team] = (stamp, config)
+    config = dict(cached[1])
+    config["members"] = list(config["members"])
+    return config
 
 # ── Mailbox ──
 
-def send_message(from_id: str, to_id: str, text: str, msg_type: str = "message") -> dict:
-    from_name, from_team = _parse_identity(from_id)
-    to_name, to_team = _parse_identity(to_id)
-    if from_team != to_team:
-        raise ValueError("Cross-team messaging not supported")
-    msg = {
-        "id": str(uuid.uuid4())[:8],
+_XML_TMPL = (
+    "<teammate-message from={sender} team={team} type={type} timestamp={timestamp}>\n"
+    "{text}\n"
+    "</teammate-message>"
+)
+
+def _make_message(msg_id: str, from_name: str, to_name: str, msg_type: str, text: str, ts: str) -> dict:
+    return {
+        "id": msg_id,
         "from": from_name,
         "to": to_name,
         "type": msg_type,
         "text": text,
-        "timestamp": _now(),
+        "timestamp": ts,
     }
+
+def send_message(from_id: str, to_id: str, text: str, msg_type: str = "message") -> dict:
+    from_name, from_team = _parse_identity(from_id)
+    to_name, to_team = _parse_identity(to_id)
+    if from_team != to_team:
+        raise ValueError("Cross-team messaging not supported")
+    msg = _make_message(os.urandom(4).hex(), from_name, to_name, msg_type, text, _now())
     _append_to_inbox(to_team, to_name, msg)
     return msg
 
 def broadcast(from_id: str, text: str, msg_type: str = "broadcast") -> list[dict]:
     from_name, team = _parse_identity(from_id)
     config = team_info(team)
-    msgs = []
-    for member in config["members"]:
-        if member != from_name:
-            msg = {
-                "id": str(uuid.uuid4())[:8],
-                "from": from_name,
-                "to": member,
-                "type": msg_type,
-                "text": text,
-                "timestamp": _now(),
-            }
-            _append_to_inbox(team, member, msg)
-            msgs.append(msg)
+    # Broadcasts are logically simultaneous: one timestamp for the whole fanout
+    ts = _now()
+    recipients = [m for m in config["members"] if m != from_name]
+    # One getrandom() for every message id in the fanout
+    ids = os.urandom(4 * len(recipients)).hex()
+    msgs = [
+        _make_message(ids[8 * i:8 * i + 8], from_name, member, msg_type, text, ts)
+        for i, member in enumerate(recipients)
+    ]
+    if msgs:
+        _inbox_path(team, from_name).parent.mkdir(parents=True, exist_ok=True)
+    for msg in msgs:
+        _append_inbox_line(_inbox_path(team, msg["to"]), _dumps(msg) + b"\n")
     return msgs
 
 def _append_to_inbox(team: str, agent: str, msg: dict):
     path = _inbox_path(team, agent)
     path.parent.mkdir(parents=True, exist_ok=True)
-    # File-locked append
-    with open(path, "a+") as f:
-        fcntl.flock(f, fcntl.LOCK_EX)
+    _append_inbox_line(path, _dumps(msg) + b"\n")
+
+def _migrate_legacy_inbox(path: Path) -> bool:
+    """Convert a pre-JSONL <agent>.json array inbox into <agent>.jsonl.
+
+    The old message-index cursor becomes a byte offset so already-polled
+    messages stay read. Returns True if the JSONL inbox exists afterwards.
+    """
+    legacy, legacy_cursor = _legacy_inbox_paths(path)
+    try:
+        messages = _loads(legacy.read_bytes() or b"[]")
+    except FileNotFoundError:
+        return path.exists()
+    lines = [_dumps(msg) + b"\n" for msg in messages]
+    tmp = _tmp_path(path)
+    tmp.write_bytes(b"".join(lines))
+    try:
+        # link, not replace: never clobber an inbox another writer already created
+        os.link(tmp, path)
+    except FileExistsError:
+        pass
+    else:
         try:
-            f.seek(0)
-            content = f.read().strip()
-            inbox = json.loads(content) if content else []
-            inbox.append(msg)
-            f.seek(0)
-            f.truncate()
-            f.write(json.dumps(inbox, indent=2))
-        finally:
-            fcntl.flock(f, fcntl.LOCK_UN)
+            read = int(legacy_cursor.read_bytes())
+        except FileNotFoundError:
+            read = 0
+        offset_path = path.parent / _cursor_name(path.stem)
+        if read and not offset_path.exists():
+            _write_cursor(offset_path, sum(len(l) for l in lines[:read]))
+    finally:
+        tmp.unlink()
+    for old in (legacy, legacy_cursor):
+        try:
+            old.unlink()
+        except FileNotFoundError:
+            pass
+    return True
+
+def _ensure_inbox(path: Path):
+    if not _migrate_legacy_inbox(path):
+        path.touch()
+
+def _append_inbox_line(path: Path, line: bytes):
+    try:
+        _append_line(path, line, create=False)
+    except FileNotFoundError:
+        # First write to this inbox: carry over a pre-JSONL inbox if there is one
+        _migrate_legacy_inbox(path)
+        _append_line(path, line)
+
+def _append_line(path: Path, line: bytes, create: bool = True):
+    # File-locked append: one JSON object per line, never rewrite history.
+    # Raw fd rather than open(): no buffer object, no fstat/lseek on open.
+    flags = os.O_WRONLY | os.O_APPEND | (os.O_CREAT if create else 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        view = memoryview(line)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)  # closing the fd releases the lock
+
+def _write_cursor(path: Path, offset: int):
+    # Bare open/write/close: the cursor is a few bytes, skip the file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, str(offset).encode())
+    finally:
+        os.close(fd)
+
+# Inboxes are only ever appended to, so readers need no lock: every complete
+# (newline-terminated) line is a whole message, and a trailing line without a
+# newline is an append still in flight that the next read will pick up.
 
 def poll_inbox(identity: str, format: str = "xml") -> str:
     """Poll inbox for new messages since last read. Returns XML or JSON."""
@@ -162,142 +329,352 @@ def poll_inbox(identity: str, format: str = "xml") -> str:
     inbox_path = _inbox_path(team, name)
     cursor_path = _cursor_path(team, name)
     
-    if not inbox_path.exists():
-        return "" if format == "xml" else "[]"
+    # Read cursor (byte offset just past the last message read)
+    try:
+        cursor = int(cursor_path.read_bytes())
+    except FileNotFoundError:
+        cursor = 0
     
-    with open(inbox_path, "r") as f:
-        fcntl.flock(f, fcntl.LOCK_SH)
-        try:
-            content = f.read().strip()
-            messages = json.loads(content) if content else []
-        finally:
-            fcntl.flock(f, fcntl.LOCK_UN)
-    
-    # Read cursor (index of last read message)
-    cursor = 0
-    if cursor_path.exists():
-        cursor = int(cursor_path.read_text().strip())
+    # Idle fast path: a single stat tells us nothing was appended since last poll
+    try:
+        size = os.stat(inbox_path).st_size
+    except FileNotFoundError:
+        if not _migrate_legacy_inbox(inbox_path):
+            return "" if format == "xml" else "[]"
+        return poll_inbox(identity, format)
+    if size == cursor:
+        return "" if format == "xml" else "[]"
+    if size < cursor:
+        # Inbox was recreated behind our cursor; start over
+        cursor = 0
     
-    new_msgs = messages[cursor:]
+    new_msgs = []
+    end = cursor
+    with open(inbox_path, "rb") as f:
+        f.seek(cursor)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            end += len(line)
+            if line.strip():
+                new_msgs.append(_loads(line))
     # Update cursor
-    cursor_path.write_text(str(len(messages)))
+    if end != cursor:
+        _write_cursor(cursor_path, end)
     
     if not new_msgs:
         return "" if format == "xml" else "[]"
     
     if format == "json":
-        return json.dumps(new_msgs, indent=2)
+        return _dumps(new_msgs, indent=True).decode()
     
     # XML format for context injection
-    parts = []
-    for msg in new_msgs:
-        parts.append(
-            f'<teammate-message from="{msg.get("from", "unknown")}" '
-            f'team="{team}" type="{msg.get("type", "message")}" '
-            f'timestamp="{msg.get("timestamp", "")}">\n'
-            f'{msg.get("text", "")}\n'
-            f'</teammate-message>'
+    team_attr = quoteattr(team)
+    return "\n".join([
+        _XML_TMPL.format(
+            sender=quoteattr(msg.get("from", "unknown")),
+            team=team_attr,
+            type=quoteattr(msg.get("type", "message")),
+            timestamp=quoteattr(msg.get("timestamp", "")),
+            text=msg.get("text", ""),
         )
-    return "\n".join(parts)
+        for msg in new_msgs
+    ])
 
-def read_inbox(identity: str) -> list[dict]:
-    """Read all messages in inbox without advancing cursor."""
+def iter_inbox(identity: str) -> Iterator[dict]:
+    """Yield messages in inbox one at a time, without advancing cursor."""
     name, team = _parse_identity(identity)
     path = _inbox_path(team, name)
-    if not path.exists():
-        return []
-    return json.loads(path.read_text() or "[]")
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        if not _migrate_legacy_inbox(path):
+            return
+        f = open(path, "rb")
+    with f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                yield _loads(line)
+
+def read_inbox(identity: str) -> list[dict]:
+    """Read all messages in inbox without advancing cursor."""
+    return list(iter_inbox(identity))
 
 # ── Tasks ──
 
+# Lock fds kept open for the life of the process, keyed by lock file path.
+# flock() locks belong to the open file description, so one shared fd does not
+# keep threads apart: each lock file also gets a threading.Lock taken first.
+_lock_fds: dict[str, int] = {}
+_thread_locks: dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+def _close_lock_fds():
+    for fd in _lock_fds.values():
+        os.close(fd)
+    _lock_fds.clear()
+
+atexit.register(_close_lock_fds)
+
+def _reset_locks_after_fork():
+    # A forked child shares the parent's open file descriptions, and with them
+    # the parent's flock() locks; reopen per process instead. Thread locks held
+    # by threads that don't exist in the child are dropped rather than inherited.
+    global _thread_locks, _thread_locks_guard
+    for fd in _lock_fds.values():
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    _lock_fds.clear()
+    _thread_locks = {}
+    _thread_locks_guard = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+def _get_lock(team: str) -> int:
+    """Return a cached fd for the team's task lock, reopening it if the file was removed.
+
+    Only call with the team's thread lock held (see _task_lock).
+    """
+    lock_path = str(_tasks_dir(team) / ".lock")
+    fd = _lock_fds.get(lock_path)
+    if fd is not None:
+        if os.fstat(fd).st_nlink:
+            return fd
+        # Team was deleted (and maybe recreated) under us; don't lock a dead inode
+        os.close(fd)
+    fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+    _lock_fds[lock_path] = fd
+    return fd
+
+@contextmanager
+def _task_lock(team: str):
+    """Hold the team's task lock against other threads and other processes."""
+    lock_path = str(_tasks_dir(team) / ".lock")
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(lock_path, threading.Lock())
+    with thread_lock:
+        fd = _get_lock(team)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+def _next_task_id(tasks_dir: Path) -> int:
+    """Allocate the next task id from the .next_id counter. Caller holds the tasks lock."""
+    counter = tasks_dir / ".next_id"
+    try:
+        last = int(counter.read_text().strip() or 0)
+    except FileNotFoundError:
+        # Teams created before the counter existed: seed from the highest task id,
+        # including ids that only survive as by-status links
+        ids = []
+        dirs = [tasks_dir] + [tasks_dir / "by-status" / status for status in _TASK_STATUSES]
+        for d in dirs:
+            try:
+                with os.scandir(d) as it:
+                    ids += [int(e.name[:-5]) for e in it if e.name.endswith(".json") and e.name[:-5].isdigit()]
+            except FileNotFoundError:
+                continue
+        last = max(ids, default=0)
+    _atomic_write_bytes(counter, str(last + 1).encode())
+    return last + 1
+
+# Hardlinks to task files grouped by status: tasks/by-status/<status>/<id>.json
+_TASK_STATUSES = ("pending", "in_progress", "completed")
+
+def _ensure_status_index(tasks_dir: Path) -> Path:
+    """Return the by-status index, building it from the task files if missing. Caller holds the tasks lock."""
+    index = tasks_dir / "by-status"
+    if index.is_dir():
+        return index
+    import shutil
+    # Build beside the live path and rename into place so a crash never leaves a partial index
+    tmp = _tmp_path(index)
+    shutil.rmtree(tmp, ignore_errors=True)
+    for status in _TASK_STATUSES:
+        (tmp / status).mkdir(parents=True)
+    with os.scandir(tasks_dir) as it:
+        for e in it:
+            if e.name.endswith(".json"):
+                os.link(e.path, tmp / _load_task(e.path)["status"] / e.name)
+    os.rename(tmp, index)
+    return index
+
+def _link_status(index: Path, src: Path, name: str, status: str):
+    """Make by-status/<status>/<name> a link to src, replacing any stale entry, and drop it elsewhere."""
+    target = index / status / name
+    tmp = _tmp_path(target)
+    try:
+        tmp.unlink()
+    except FileNotFoundError:
+        pass
+    os.link(src, tmp)
+    os.replace(tmp, target)
+    for other in _TASK_STATUSES:
+        if other != status:
+            try:
+                (index / other / name).unlink()
+            except FileNotFoundError:
+                pass
+
+def _move_status_link(tasks_dir: Path, index: Path, task_id: str, old: str, new: str):
+    name = f"{task_id}.json"
+    try:
+        os.replace(index / old / name, index / new / name)
+    except FileNotFoundError:
+        # Link lost or left elsewhere by an interrupted update; rebuild it
+        _link_status(index, tasks_dir / name, name, new)
+
 def create_task(team: str, subject: str, description: str = "", assigned_to: str = "", assigned_by: str = "") -> dict:
     tasks_dir = _tasks_dir(team)
     tasks_dir.mkdir(parents=True, exist_ok=True)
-    lock_path = tasks_dir / ".lock"
     
-    with open(lock_path, "w") as lock:
-        fcntl.flock(lock, fcntl.LOCK_EX)
-        try:
-            existing = [f for f in tasks_dir.glob("*.json")]
-            task_id = str(len(existing) + 1)
-            task = {
-                "id": task_id,
-                "subject": subject,
-                "description": description,
-                "status": "pending",
-                "assigned_to": assigned_to or None,
-                "assigned_by": assigned_by or None,
-                "created": _now(),
-                "claimed_at": None,
-                "completed_at": None,
-                "result": None,
-            }
-            (tasks_dir / f"{task_id}.json").write_text(json.dumps(task, indent=2))
-        finally:
-            fcntl.flock(lock, fcntl.LOCK_UN)
+    # One timestamp for the task and its assignment message
+    ts = _now()
+    with _task_lock(team):
+        index = _ensure_status_index(tasks_dir)
+        task_id = str(_next_task_id(tasks_dir))
+        task = {
+            "id": task_id,
+            "subject": subject,
+            "description": description,
+            "status": "pending",
+            "assigned_to": assigned_to or None,
+            "assigned_by": assigned_by or None,
+            "created": ts,
+            "claimed_at": None,
+            "completed_at": None,
+            "result": None,
+        }
+        base = tasks_dir / f"{task_id}.json"
+        tmp = _tmp_path(base)
+        tmp.write_bytes(_dumps(task, indent=True))
+        # Index before publishing: a crash in between leaves a dangling link, never an unlisted task
+        _link_status(index, tmp, base.name, "pending")
+        os.replace(tmp, base)
     
     # If assigned, send task_assignment message
     if assigned_to and assigned_by:
-        send_message(
-            f"{assigned_by}@{team}",
-            f"{assigned_to}@{team}",
-            json.dumps({"type": "task_assignment", "taskId": task_id, "subject": subject, "description": description}),
-            msg_type="task_assignment"
-        )
+        text = _dumps({"type": "task_assignment", "taskId": task_id, "subject": subject, "description": description}).decode()
+        _append_to_inbox(team, assigned_to, _make_message(
+            os.urandom(4).hex(), assigned_by, assigned_to, "task_assignment", text, ts,
+        ))
     
     return task
 
+def _apply_event(task: dict, event: dict):
+    task["status"] = event["status"]
+    if event["status"] == "in_progress":
+        task["assigned_to"] = event["agent"]
+        task["claimed_at"] = event["ts"]
+    elif event["status"] == "completed":
+        task["completed_at"] = event["ts"]
+        task["result"] = event.get("result")
+
+def _load_task(task_path: str) -> dict:
+    """Read a task's immutable base record and replay its status events on top."""
+    with open(task_path, "rb") as f:
+        task = _loads(f.read())
+    try:
+        with open(task_path[:-len(".json")] + ".events", "rb") as f:
+            for line in f:
+                # Same rule as inboxes: an unterminated last line is still being written
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    _apply_event(task, _loads(line))
+    except FileNotFoundError:
+        pass
+    return task
+
+def _record_event(task_path: str, task: dict, event: dict):
+    """Append a status event for a task. Caller holds the tasks lock."""
+    _append_line(Path(task_path[:-len(".json")] + ".events"), _dumps(event) + b"\n")
+    _apply_event(task, event)
+
 def claim_task(team: str, task_id: str, agent: str) -> dict:
     tasks_dir = _tasks_dir(team)
-    lock_path = tasks_dir / ".lock"
-    task_path = tasks_dir / f"{task_id}.json"
+    task_path = str(tasks_dir / f"{task_id}.json")
     
-    if not task_path.exists():
+    if not os.path.exists(task_path):
         raise ValueError(f"Task {task_id} not found")
     
-    with open(lock_path, "w") as lock:
-        fcntl.flock(lock, fcntl.LOCK_EX)
-        try:
-            task = json.loads(task_path.read_text())
-            if task["status"] != "pending":
-                raise ValueError(f"Task {task_id} is {task['status']}, cannot claim")
-            task["status"] = "in_progress"
-            task["assigned_to"] = agent
-            task["claimed_at"] = _now()
-            task_path.write_text(json.dumps(task, indent=2))
-        finally:
-            fcntl.flock(lock, fcntl.LOCK_UN)
+    with _task_lock(team):
+        task = _load_task(task_path)
+        if task["status"] != "pending":
+            raise ValueError(f"Task {task_id} is {task['status']}, cannot claim")
+        index = _ensure_status_index(tasks_dir)
+        _record_event(task_path, task, {"ts": _now(), "status": "in_progress", "agent": agent})
+        _move_status_link(tasks_dir, index, task_id, "pending", "in_progress")
     return task
 
 def complete_task(team: str, task_id: str, agent: str, result: str = "") -> dict:
     tasks_dir = _tasks_dir(team)
-    lock_path = tasks_dir / ".lock"
-    task_path = tasks_dir / f"{task_id}.json"
+    task_path = str(tasks_dir / f"{task_id}.json")
     
-    if not task_path.exists():
+    if not os.path.exists(task_path):
         raise ValueError(f"Task {task_id} not found")
     
-    with open(lock_path, "w") as lock:
-        fcntl.flock(lock, fcntl.LOCK_EX)
-        try:
-            task = json.loads(task_path.read_text())
-            if task["status"] != "in_progress":
-                raise ValueError(f"Task {task_id} is {task['status']}, cannot complete")
-            task["status"] = "completed"
-            task["completed_at"] = _now()
-            task["result"] = result
-            task_path.write_text(json.dumps(task, indent=2))
-        finally:
-            fcntl.flock(lock, fcntl.LOCK_UN)
+    with _task_lock(team):
+        task = _load_task(task_path)
+        if task["status"] != "in_progress":
+            raise ValueError(f"Task {task_id} is {task['status']}, cannot complete")
+        index = _ensure_status_index(tasks_dir)
+        _record_event(task_path, task, {"ts": _now(), "status": "completed", "agent": agent, "result": result})
+        _move_status_link(tasks_dir, index, task_id, "in_progress", "completed")
     return task
 
 def list_tasks(team: str, status: Optional[str] = None) -> list[dict]:
     tasks_dir = _tasks_dir(team)
     if not tasks_dir.exists():
         return []
+    if status is not None:
+        return _list_tasks_by_status(team, tasks_dir, status)
+    with os.scandir(tasks_dir) as it:
+        entries = sorted((e for e in it if e.name.endswith(".json")), key=lambda e: e.name)
+    return [_load_task(e.path) for e in entries]
+
+def _list_tasks_by_status(team: str, tasks_dir: Path, status: str) -> list[dict]:
+    """Load only the tasks linked under by-status/<status>."""
+    if status not in _TASK_STATUSES:
+        return []
+    if not (tasks_dir / "by-status").is_dir():
+        with _task_lock(team):
+            _ensure_status_index(tasks_dir)
+    with os.scandir(tasks_dir / "by-status" / status) as it:
+        names = sorted(e.name for e in it if e.name.endswith(".json"))
     tasks = []
-    for f in sorted(tasks_dir.glob("*.json")):
-        task = json.loads(f.read_text())
-        if status is None or task["status"] == status:
+    for name in names:
+        # The base file and its events are authoritative; the link only narrows the scan
+        try:
+            task = _load_task(os.path.join(tasks_dir, name))
+        except FileNotFoundError:
+            task = None
+        if task is None or task["status"] != status:
+            task = _repair_status_link(team, tasks_dir, name)
+        if task is not None and task["status"] == status:
             tasks.append(task)
     return tasks
+
+def _repair_status_link(team: str, tasks_dir: Path, name: str) -> Optional[dict]:
+    """Fix an index entry left behind by an interrupted create/claim/complete."""
+    with _task_lock(team):
+        index = tasks_dir / "by-status"
+        base = tasks_dir / name
+        try:
+            task = _load_task(str(base))
+        except FileNotFoundError:
+            # Task file never got published (or was removed): drop the dangling links
+            for status in _TASK_STATUSES:
+                try:
+                    (index / status / name).unlink()
+                except FileNotFoundError:
+                    pass
+            return None
+        _link_status(index, base, name, task["status"])
+        return task
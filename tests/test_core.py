@@ -16,6 +16,7 @@ core.TEAMS_ROOT = Path(_tmpdir) / "teams"
 def setup_function():
     """Clean up between tests."""
     import shutil
+    core._clear_path_caches()
     if core.TEAMS_ROOT.exists():
         shutil.rmtree(core.TEAMS_ROOT)
 
@@ -145,3 +146,364 @@ def test_read_inbox():
     # read_inbox doesn't advance cursor
     xml = core.poll_inbox("b@read-team")
     assert "hey" in xml
+
+
+def test_inbox_is_append_only_jsonl():
+    core.create_team("log-team", ["a", "b"])
+    core.send_message("a@log-team", "b@log-team", "one")
+    core.send_message("a@log-team", "b@log-team", "two")
+    lines = core._inbox_path("log-team", "b").read_text().splitlines()
+    assert [json.loads(l)["text"] for l in lines] == ["one", "two"]
+
+
+def test_poll_cursor_is_byte_offset():
+    core.create_team("off-team", ["a", "b"])
+    core.send_message("a@off-team", "b@off-team", "first")
+    core.poll_inbox("b@off-team")
+    inbox = core._inbox_path("off-team", "b")
+    cursor = core._cursor_path("off-team", "b")
+    assert int(cursor.read_text()) == inbox.stat().st_size
+    core.send_message("a@off-team", "b@off-team", "second")
+    msgs = json.loads(core.poll_inbox("b@off-team", "json"))
+    assert [m["text"] for m in msgs] == ["second"]
+
+
+def test_list_teams_skips_non_team_entries():
+    core.create_team("real-team")
+    (core.TEAMS_ROOT / "stray.txt").write_text("x")
+    (core.TEAMS_ROOT / "empty-dir").mkdir()
+    assert [t["name"] for t in core.list_teams()] == ["real-team"]
+
+
+def test_task_ids_survive_deletion():
+    core.create_team("id-team", ["w"])
+    core.create_task("id-team", "task 1")
+    core.create_task("id-team", "task 2")
+    (core._tasks_dir("id-team") / "1.json").unlink()
+    task = core.create_task("id-team", "task 3")
+    assert task["id"] == "3"
+
+
+def test_task_id_counter_seeded_from_existing_tasks():
+    core.create_team("legacy-team", ["w"])
+    core.create_task("legacy-team", "task 1")
+    core.create_task("legacy-team", "task 2")
+    (core._tasks_dir("legacy-team") / ".next_id").unlink()
+    assert core.create_task("legacy-team", "task 3")["id"] == "3"
+
+
+def test_task_lock_fd_reopened_after_team_recreated():
+    core.create_team("lock-team", ["w"])
+    core.create_task("lock-team", "task 1")
+    fd = core._get_lock("lock-team")
+    assert core._get_lock("lock-team") == fd
+    core.delete_team("lock-team")
+    core.create_team("lock-team", ["w"])
+    assert core.create_task("lock-team", "fresh")["id"] == "1"
+    assert os.fstat(core._get_lock("lock-team")).st_nlink == 1
+
+
+def test_members_stored_one_per_line():
+    core.create_team("roster-team", ["alice"])
+    core.add_member("roster-team", "bob")
+    core.add_member("roster-team", "bob")
+    assert core._members_path("roster-team").read_text() == "alice\nbob\n"
+    assert "members" not in json.loads(core._config_path("roster-team").read_text())
+    assert core.team_info("roster-team")["members"] == ["alice", "bob"]
+
+
+def test_legacy_config_members_still_read():
+    core.create_team("old-team")
+    core._members_path("old-team").unlink()
+    cp = core._config_path("old-team")
+    cp.write_text(json.dumps({"name": "old-team", "members": ["a"], "created": "x"}))
+    assert core.team_info("old-team")["members"] == ["a"]
+    core.add_member("old-team", "b")
+    assert core.team_info("old-team")["members"] == ["a", "b"]
+
+
+def test_broadcast_shares_timestamp():
+    core.create_team("ts-team", ["lead", "w1", "w2", "w3"])
+    msgs = core.broadcast("lead@ts-team", "sync")
+    assert len({m["timestamp"] for m in msgs}) == 1
+    assert len({m["id"] for m in msgs}) == 3
+    assert all(len(m["id"]) == 8 and int(m["id"], 16) >= 0 for m in msgs)
+    assert core.read_inbox("w3@ts-team")[0]["text"] == "sync"
+
+
+def test_task_transitions_append_events():
+    core.create_team("ev-team", ["w"])
+    core.create_task("ev-team", "logged", "long description " * 100)
+    base = core._tasks_dir("ev-team") / "1.json"
+    before = base.read_bytes()
+    core.claim_task("ev-team", "1", "w")
+    core.complete_task("ev-team", "1", "w", "ok")
+    assert base.read_bytes() == before
+    events = (core._tasks_dir("ev-team") / "1.events").read_text().splitlines()
+    assert [json.loads(l)["status"] for l in events] == ["in_progress", "completed"]
+    [task] = core.list_tasks("ev-team", "completed")
+    assert task["assigned_to"] == "w"
+    assert task["result"] == "ok"
+
+
+def test_poll_xml_escapes_attributes():
+    core.create_team("esc-team", ["a", "b"])
+    core.send_message("a@esc-team", "b@esc-team", "<raw & text>", 'weird"&<type')
+    xml = core.poll_inbox("b@esc-team")
+    assert "type='weird\"&amp;&lt;type'" in xml
+    assert "\n<raw & text>\n" in xml
+
+
+def test_team_info_cache_sees_external_changes():
+    core.create_team("cache-team", ["a"])
+    info = core.team_info("cache-team")
+    info["members"].append("mutated")
+    assert core.team_info("cache-team")["members"] == ["a"]
+    # Another process adding a member is picked up via the stat check
+    with open(core._members_path("cache-team"), "a") as f:
+        f.write("b\n")
+    assert core.team_info("cache-team")["members"] == ["a", "b"]
+
+
+def test_task_assignment_shares_created_timestamp():
+    core.create_team("when-team", ["lead", "worker"])
+    task = core.create_task("when-team", "t", assigned_to="worker", assigned_by="lead")
+    [msg] = core.read_inbox("worker@when-team")
+    assert msg["timestamp"] == task["created"]
+    assert msg["from"] == "lead"
+
+
+def test_poll_leaves_partial_line_for_next_poll():
+    core.create_team("tear-team", ["a", "b"])
+    core.send_message("a@tear-team", "b@tear-team", "whole")
+    inbox = core._inbox_path("tear-team", "b")
+    line = json.dumps({"from": "a", "text": "torn"}).encode() + b"\n"
+    with open(inbox, "ab") as f:
+        f.write(line[:10])
+    assert [m["text"] for m in core.read_inbox("b@tear-team")] == ["whole"]
+    assert [m["text"] for m in json.loads(core.poll_inbox("b@tear-team", "json"))] == ["whole"]
+    with open(inbox, "ab") as f:
+        f.write(line[10:])
+    assert [m["text"] for m in json.loads(core.poll_inbox("b@tear-team", "json"))] == ["torn"]
+
+
+def test_atomic_writes_leave_no_temp_files():
+    core.create_team("atomic-team", ["a"])
+    core.create_task("atomic-team", "t")
+    core.remove_member("atomic-team", "a")
+    leftovers = [p for p in core._team_dir("atomic-team").rglob("*.tmp")]
+    assert leftovers == []
+
+
+def test_idle_poll_does_not_open_inbox():
+    core.create_team("idle-team", ["a", "b"])
+    core.send_message("a@idle-team", "b@idle-team", "once")
+    core.poll_inbox("b@idle-team")
+    real_open = open
+    inbox = str(core._inbox_path("idle-team", "b"))
+
+    def guarded_open(path, *args, **kwargs):
+        assert str(path) != inbox, "idle poll opened the inbox"
+        return real_open(path, *args, **kwargs)
+
+    with patch("builtins.open", guarded_open):
+        assert core.poll_inbox("b@idle-team") == ""
+        assert core.poll_inbox("b@idle-team", "json") == "[]"
+
+
+def test_iter_inbox_is_lazy():
+    core.create_team("lazy-team", ["a", "b"])
+    for i in range(3):
+        core.send_message("a@lazy-team", "b@lazy-team", f"m{i}")
+    it = core.iter_inbox("b@lazy-team")
+    assert next(it)["text"] == "m0"
+    assert [m["text"] for m in it] == ["m1", "m2"]
+    assert list(core.iter_inbox("nobody@lazy-team")) == []
+
+
+def test_status_index_tracks_transitions():
+    core.create_team("idx-team", ["w"])
+    for i in range(3):
+        core.create_task("idx-team", f"task {i}")
+    core.claim_task("idx-team", "2", "w")
+    index = core._tasks_dir("idx-team") / "by-status"
+    assert sorted(os.listdir(index / "pending")) == ["1.json", "3.json"]
+    assert os.listdir(index / "in_progress") == ["2.json"]
+    core.complete_task("idx-team", "2", "w")
+    assert os.listdir(index / "in_progress") == []
+    assert [t["id"] for t in core.list_tasks("idx-team", "completed")] == ["2"]
+
+
+def test_status_index_built_for_existing_tasks():
+    import shutil
+    core.create_team("old-idx-team", ["w"])
+    core.create_task("old-idx-team", "a")
+    core.create_task("old-idx-team", "b")
+    core.claim_task("old-idx-team", "1", "w")
+    shutil.rmtree(core._tasks_dir("old-idx-team") / "by-status")
+    assert [t["id"] for t in core.list_tasks("old-idx-team", "pending")] == ["2"]
+    assert [t["id"] for t in core.list_tasks("old-idx-team", "in_progress")] == ["1"]
+
+
+def test_path_helpers_follow_teams_root_after_cache_clear():
+    old_root = core.TEAMS_ROOT
+    assert core._team_dir("x") is core._team_dir("x")
+    try:
+        core.TEAMS_ROOT = old_root / "elsewhere"
+        core._clear_path_caches()
+        assert core._inbox_path("x", "a").parent.parent == old_root / "elsewhere" / "x"
+    finally:
+        core.TEAMS_ROOT = old_root
+        core._clear_path_caches()
+
+
+def test_atomic_write_from_threads():
+    import threading
+    target = Path(_tmpdir) / "atomic-threads.txt"
+    errors = []
+
+    def writer(n):
+        try:
+            for _ in range(50):
+                core._atomic_write_bytes(target, str(n).encode())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert target.read_text() in {str(n) for n in range(8)}
+
+
+def test_create_task_from_threads():
+    import threading
+    core.create_team("thread-team", ["w"])
+    ids, errors = [], []
+
+    def worker():
+        try:
+            for _ in range(50):
+                ids.append(core.create_task("thread-team", "t")["id"])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(set(ids)) == 400
+    assert len(core.list_tasks("thread-team", "pending")) == 400
+
+
+def test_create_task_from_forked_processes():
+    import multiprocessing
+    core.create_team("fork-team", ["w"])
+    # Parent has a cached lock fd that every child inherits
+    core.create_task("fork-team", "seed")
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(4) as pool:
+        ids = pool.map(_create_fork_tasks, range(4))
+    ids = [i for chunk in ids for i in chunk]
+    assert len(set(ids)) == 100
+    assert len(core.list_tasks("fork-team", "pending")) == 101
+
+
+def _create_fork_tasks(_):
+    return [core.create_task("fork-team", "t")["id"] for _ in range(25)]
+
+
+def test_legacy_index_cursor_is_not_read_as_offset():
+    core.create_team("upg-team", ["a", "b"])
+    for i in range(3):
+        core.send_message("a@upg-team", "b@upg-team", f"m{i}")
+    (core._team_dir("upg-team") / "inboxes" / ".b.cursor").write_text("3")
+    msgs = json.loads(core.poll_inbox("b@upg-team", "json"))
+    assert [m["text"] for m in msgs] == ["m0", "m1", "m2"]
+
+
+def _write_legacy_inbox(team, agent, texts, cursor=None):
+    inboxes = core._team_dir(team) / "inboxes"
+    core._inbox_path(team, agent).unlink()
+    msgs = [{"id": str(i), "from": "a", "to": agent, "type": "message", "text": t, "timestamp": ""}
+            for i, t in enumerate(texts)]
+    (inboxes / f"{agent}.json").write_text(json.dumps(msgs, indent=2))
+    if cursor is not None:
+        (inboxes / f".{agent}.cursor").write_text(str(cursor))
+
+
+def test_legacy_json_inbox_migrated_on_poll():
+    core.create_team("mig-team", ["a", "b"])
+    _write_legacy_inbox("mig-team", "b", ["old0", "old1", "old2"], cursor=2)
+    msgs = json.loads(core.poll_inbox("b@mig-team", "json"))
+    assert [m["text"] for m in msgs] == ["old2"]
+    assert [m["text"] for m in core.read_inbox("b@mig-team")] == ["old0", "old1", "old2"]
+    assert not (core._team_dir("mig-team") / "inboxes" / "b.json").exists()
+
+
+def test_legacy_json_inbox_migrated_before_first_send():
+    core.create_team("mig2-team", ["a", "b"])
+    _write_legacy_inbox("mig2-team", "b", ["old"])
+    core.send_message("a@mig2-team", "b@mig2-team", "new")
+    assert [m["text"] for m in core.read_inbox("b@mig2-team")] == ["old", "new"]
+
+
+def test_list_tasks_ignores_half_written_event():
+    core.create_team("torn-task-team", ["w"])
+    core.create_task("torn-task-team", "t")
+    events = core._tasks_dir("torn-task-team") / "1.events"
+    with open(events, "ab") as f:
+        f.write(b'{"ts": "x", "status": "in_pro')
+    [task] = core.list_tasks("torn-task-team")
+    assert task["status"] == "pending"
+
+
+def test_team_info_cache_sees_same_size_replace():
+    core.create_team("ino-team", ["aa"])
+    assert core.team_info("ino-team")["members"] == ["aa"]
+    mp = core._members_path("ino-team")
+    st = os.stat(mp)
+    tmp = mp.with_name("members.new")
+    tmp.write_text("bb\n")
+    os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp, mp)
+    assert core.team_info("ino-team")["members"] == ["bb"]
+
+
+def test_status_index_repairs_interrupted_transition():
+    core.create_team("fix-team", ["w"])
+    core.create_task("fix-team", "t")
+    core.claim_task("fix-team", "1", "w")
+    index = core._tasks_dir("fix-team") / "by-status"
+    # Crash between recording the event and moving the link
+    os.replace(index / "in_progress" / "1.json", index / "pending" / "1.json")
+    assert core.list_tasks("fix-team", "pending") == []
+    assert os.listdir(index / "in_progress") == ["1.json"]
+    assert [t["id"] for t in core.list_tasks("fix-team", "in_progress")] == ["1"]
+    core.complete_task("fix-team", "1", "w")
+    assert [t["id"] for t in core.list_tasks("fix-team", "completed")] == ["1"]
+
+
+def test_status_index_drops_dangling_link():
+    core.create_team("dangle-team", ["w"])
+    core.create_task("dangle-team", "t")
+    # Crash after indexing a new task but before publishing its file
+    (core._tasks_dir("dangle-team") / "1.json").unlink()
+    assert core.list_tasks("dangle-team", "pending") == []
+    assert os.listdir(core._tasks_dir("dangle-team") / "by-status" / "pending") == []
+
+
+def test_task_id_reseed_skips_ids_held_by_index():
+    core.create_team("reseed-team", ["w"])
+    core.create_task("reseed-team", "a")
+    core.create_task("reseed-team", "b")
+    tasks_dir = core._tasks_dir("reseed-team")
+    (tasks_dir / "2.json").unlink()
+    (tasks_dir / ".next_id").unlink()
+    task = core.create_task("reseed-team", "c")
+    assert task["id"] == "3"
+    assert [t["id"] for t in core.list_tasks("reseed-team", "pending")] == ["1", "3"]